@@ -0,0 +1,405 @@
+"""Compact, pickle-free artifact bundle for the Sepsis Prediction API.
+
+The joblib pickles in this folder are converted into a bundle directory:
+
+    artifact_bundle/
+        manifest.json        feature names, word map, sha256 of the bundle files
+                             and of the source pickles they were exported from
+        severity_model.ubj   XGBoost booster in its native binary (UBJSON) format
+        arrays.npz           float32 scaler / bridge / medians / linear model arrays
+
+Bundle checksums are checked by ``verify`` (run it at export / deploy time),
+not on every server start. The server only hashes the source pickles that
+are present, and loads them instead of the bundle when they no longer match
+the manifest (e.g. after retraining without re-exporting).
+
+The bundle is not smaller or faster than the pickles for these artifacts:
+nearly all of the bytes and load time are the XGBoost trees, which take the
+same space and parse time in either format (``verify`` prints the numbers).
+What it buys is loading without unpickling code and library-version-independent
+files.
+
+Usage (run from the backend folder):
+    python artifacts.py export [--src .] [--out artifact_bundle]
+    python artifacts.py verify [--src .] [--bundle artifact_bundle]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+BUNDLE_FORMAT_VERSION = 1
+DEFAULT_BUNDLE_DIR = "artifact_bundle"
+MANIFEST_NAME = "manifest.json"
+SEVERITY_MODEL_FILE = "severity_model.ubj"
+ARRAYS_FILE = "arrays.npz"
+
+# Same preference order as the loader in main.py
+SEVERITY_MODEL_CANDIDATES = [
+    "sepsis_honest_73_balanced.pkl",
+    "sepsis_balanced_70_70.pkl",
+    "sepsis_severity_model_FINAL_3CLASS.pkl",
+]
+PICKLE_SOURCES = {
+    "production_model": "sepsis_production_model.pkl",
+    "severity_scaler": "sepsis_scaler.pkl",
+    "clinical_bridge": "clinical_bridge.pkl",
+    "healthy_medians": "healthy_medians.pkl",
+    "feature_names": "feature_names.pkl",
+    "word_map": "word_map.pkl",
+}
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _f32(values):
+    return np.ascontiguousarray(np.asarray(values, dtype=np.float32))
+
+
+def _names(values):
+    return [str(v) for v in values]
+
+
+def _source_files(src_dir="."):
+    """Pickles an export from ``src_dir`` would read now, in loader preference order."""
+    files = [next((n for n in SEVERITY_MODEL_CANDIDATES if os.path.exists(os.path.join(src_dir, n))), None)]
+    files += [n for n in PICKLE_SOURCES.values() if os.path.exists(os.path.join(src_dir, n))]
+    return [n for n in files if n]
+
+
+def stale_sources(bundle_dir=DEFAULT_BUNDLE_DIR, src_dir="."):
+    """Source pickles in ``src_dir`` whose sha256 differs from the one recorded at export.
+
+    Pickles that are absent are not stale (the bundle can ship without them).
+    A manifest from before source hashes were recorded is stale as a whole.
+    """
+    with open(os.path.join(bundle_dir, MANIFEST_NAME)) as f:
+        recorded = json.load(f).get("sources")
+    current = _source_files(src_dir)
+    if recorded is None:
+        return current
+    return [n for n in current if recorded.get(n, {}).get("sha256") != file_sha256(os.path.join(src_dir, n))]
+
+
+def load_pickled_artifacts(src_dir="."):
+    """Load the original joblib artifacts that exist in ``src_dir``."""
+    import joblib
+
+    loaded = {}
+    for name in SEVERITY_MODEL_CANDIDATES:
+        path = os.path.join(src_dir, name)
+        if os.path.exists(path):
+            loaded["severity_model"] = joblib.load(path)
+            loaded["severity_model_source"] = name
+            break
+    for key, name in PICKLE_SOURCES.items():
+        path = os.path.join(src_dir, name)
+        if os.path.exists(path):
+            loaded[key] = joblib.load(path)
+    return loaded
+
+
+def export_bundle(src_dir=".", out_dir=DEFAULT_BUNDLE_DIR):
+    """Convert the pickled artifacts in ``src_dir`` into a bundle in ``out_dir``."""
+    src = load_pickled_artifacts(src_dir)
+    os.makedirs(out_dir, exist_ok=True)
+
+    arrays = {}
+    entries = {}
+
+    model = src.get("severity_model")
+    if model is not None:
+        if not hasattr(model, "save_model"):
+            raise ValueError(f"Severity model {type(model).__name__} has no native XGBoost format")
+        model.save_model(os.path.join(out_dir, SEVERITY_MODEL_FILE))
+        entries["severity_model"] = {
+            "source": src["severity_model_source"],
+            "type": "xgboost.XGBClassifier",
+            "file": SEVERITY_MODEL_FILE,
+            "feature_names": _names(model.get_booster().feature_names or []),
+        }
+
+    lr = src.get("production_model")
+    if lr is not None:
+        arrays["production_model.coef"] = _f32(lr.coef_)
+        arrays["production_model.intercept"] = _f32(lr.intercept_)
+        entries["production_model"] = {
+            "source": PICKLE_SOURCES["production_model"],
+            "type": "sklearn.LogisticRegression",
+            "classes": [int(c) for c in lr.classes_],
+            "feature_names": _names(getattr(lr, "feature_names_in_", [])),
+        }
+
+    scaler = src.get("severity_scaler")
+    if scaler is not None:
+        arrays["severity_scaler.mean"] = _f32(scaler.mean_)
+        arrays["severity_scaler.scale"] = _f32(scaler.scale_)
+        arrays["severity_scaler.var"] = _f32(scaler.var_)
+        entries["severity_scaler"] = {
+            "source": PICKLE_SOURCES["severity_scaler"],
+            "type": "sklearn.StandardScaler",
+            "n_samples_seen": int(np.asarray(scaler.n_samples_seen_).max()),
+            "feature_names": _names(getattr(scaler, "feature_names_in_", [])),
+        }
+
+    bridge = src.get("clinical_bridge")
+    if isinstance(bridge, dict):
+        features = list(bridge.keys())
+        arrays["clinical_bridge.mean"] = _f32([bridge[f]["mean"] for f in features])
+        arrays["clinical_bridge.std"] = _f32([bridge[f]["std"] for f in features])
+        entries["clinical_bridge"] = {"source": PICKLE_SOURCES["clinical_bridge"], "features": features}
+
+    medians = src.get("healthy_medians")
+    if isinstance(medians, dict):
+        features = list(medians.keys())
+        arrays["healthy_medians.values"] = _f32([medians[f] for f in features])
+        entries["healthy_medians"] = {"source": PICKLE_SOURCES["healthy_medians"], "features": features}
+
+    if src.get("feature_names") is not None:
+        entries["feature_names"] = {"source": PICKLE_SOURCES["feature_names"], "values": _names(src["feature_names"])}
+    if isinstance(src.get("word_map"), dict):
+        entries["word_map"] = {
+            "source": PICKLE_SOURCES["word_map"],
+            "values": {str(k): str(v) for k, v in src["word_map"].items()},
+        }
+
+    np.savez(os.path.join(out_dir, ARRAYS_FILE), **arrays)
+
+    files = {}
+    for name in (SEVERITY_MODEL_FILE, ARRAYS_FILE):
+        path = os.path.join(out_dir, name)
+        if os.path.exists(path):
+            files[name] = {"sha256": file_sha256(path), "bytes": os.path.getsize(path)}
+
+    sources = {}
+    for name in _source_files(src_dir):
+        path = os.path.join(src_dir, name)
+        sources[name] = {"sha256": file_sha256(path), "bytes": os.path.getsize(path)}
+
+    manifest = {"format_version": BUNDLE_FORMAT_VERSION, "files": files, "sources": sources, "artifacts": entries}
+    with open(os.path.join(out_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_bundle(bundle_dir=DEFAULT_BUNDLE_DIR, verify_checksums=True):
+    """Load a bundle written by :func:`export_bundle`.
+
+    Returns a dict with the same objects main.py gets from the pickles
+    (``severity_model``, ``severity_scaler``, ``clinical_bridge``, ...).
+    Missing artifacts are ``None``. Raises ``ValueError`` on a format
+    mismatch, or on a checksum mismatch when ``verify_checksums`` is set.
+    """
+    with open(os.path.join(bundle_dir, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != BUNDLE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported bundle format: {manifest.get('format_version')}")
+
+    if verify_checksums:
+        for name, info in manifest.get("files", {}).items():
+            if file_sha256(os.path.join(bundle_dir, name)) != info["sha256"]:
+                raise ValueError(f"Checksum mismatch for {name}")
+
+    entries = manifest.get("artifacts", {})
+    loaded = {key: None for key in ("severity_model", *PICKLE_SOURCES)}
+
+    arrays = {}
+    arrays_path = os.path.join(bundle_dir, ARRAYS_FILE)
+    if os.path.exists(arrays_path):
+        with np.load(arrays_path, allow_pickle=False) as npz:
+            arrays = {k: npz[k] for k in npz.files}
+
+    if "severity_model" in entries:
+        import xgboost as xgb
+
+        model = xgb.XGBClassifier()
+        model.load_model(os.path.join(bundle_dir, entries["severity_model"]["file"]))
+        loaded["severity_model"] = model
+
+    if "production_model" in entries:
+        from sklearn.linear_model import LogisticRegression
+
+        entry = entries["production_model"]
+        lr = LogisticRegression()
+        lr.coef_ = arrays["production_model.coef"]
+        lr.intercept_ = arrays["production_model.intercept"]
+        lr.classes_ = np.asarray(entry["classes"])
+        lr.n_features_in_ = int(lr.coef_.shape[1])
+        if entry["feature_names"]:
+            lr.feature_names_in_ = np.asarray(entry["feature_names"], dtype=object)
+        loaded["production_model"] = lr
+
+    if "severity_scaler" in entries:
+        from sklearn.preprocessing import StandardScaler
+
+        entry = entries["severity_scaler"]
+        scaler = StandardScaler()
+        scaler.mean_ = arrays["severity_scaler.mean"]
+        scaler.scale_ = arrays["severity_scaler.scale"]
+        scaler.var_ = arrays["severity_scaler.var"]
+        scaler.n_features_in_ = int(scaler.mean_.shape[0])
+        scaler.n_samples_seen_ = entry["n_samples_seen"]
+        if entry["feature_names"]:
+            scaler.feature_names_in_ = np.asarray(entry["feature_names"], dtype=object)
+        loaded["severity_scaler"] = scaler
+
+    if "clinical_bridge" in entries:
+        means = arrays["clinical_bridge.mean"]
+        stds = arrays["clinical_bridge.std"]
+        loaded["clinical_bridge"] = {
+            name: {"mean": float(means[i]), "std": float(stds[i])}
+            for i, name in enumerate(entries["clinical_bridge"]["features"])
+        }
+
+    if "healthy_medians" in entries:
+        values = arrays["healthy_medians.values"]
+        loaded["healthy_medians"] = {
+            name: float(values[i]) for i, name in enumerate(entries["healthy_medians"]["features"])
+        }
+
+    if "feature_names" in entries:
+        loaded["feature_names"] = list(entries["feature_names"]["values"])
+    if "word_map" in entries:
+        loaded["word_map"] = dict(entries["word_map"]["values"])
+
+    return loaded
+
+
+def _dir_bytes(paths):
+    return sum(os.path.getsize(p) for p in paths if os.path.exists(p))
+
+
+def _timed_load(fn, repeats=3):
+    """Best-of-``repeats`` wall time and Python heap retained by the loaded objects."""
+    elapsed = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        elapsed = min(elapsed, time.perf_counter() - start)
+    tracemalloc.start()
+    result = fn()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, retained
+
+
+def verify_bundle(src_dir=".", bundle_dir=DEFAULT_BUNDLE_DIR, n_samples=2000, seed=0):
+    """Check that the bundle reproduces the pickled artifacts; returns True on success."""
+    import pandas as pd
+
+    # Import heavy libraries up front so both timings measure artifact loading only
+    import joblib  # noqa: F401
+    import sklearn.linear_model  # noqa: F401
+    import sklearn.preprocessing  # noqa: F401
+    import xgboost.sklearn  # noqa: F401
+
+    def serving_load():
+        # What main.py does at startup: staleness check, then load without re-hashing the bundle
+        stale_sources(bundle_dir, src_dir)
+        return load_bundle(bundle_dir, verify_checksums=False)
+
+    bundle, t_bundle, mem_bundle = _timed_load(serving_load)
+    src, t_pickle, mem_pickle = _timed_load(lambda: load_pickled_artifacts(src_dir))
+
+    rng = np.random.default_rng(seed)
+    ok = True
+
+    def check(label, passed, detail=""):
+        nonlocal ok
+        ok = ok and passed
+        print(f"  {'✓' if passed else '✗'} {label}{f' ({detail})' if detail else ''}")
+
+    print("--- ARTIFACT BUNDLE EQUIVALENCE ---")
+    try:
+        load_bundle(bundle_dir, verify_checksums=True)
+        check("bundle checksums", True)
+    except ValueError as e:
+        check("bundle checksums", False, str(e))
+    stale = stale_sources(bundle_dir, src_dir)
+    check("source pickles match manifest", not stale, f"re-export needed: {', '.join(stale)}" if stale else "")
+    if src.get("severity_model") is not None:
+        model, clone = src["severity_model"], bundle["severity_model"]
+        names = list(model.get_booster().feature_names or [])
+        X = pd.DataFrame(rng.normal(0.0, 3.0, size=(n_samples, len(names))), columns=names)
+        diff = float(np.max(np.abs(model.predict_proba(X) - clone.predict_proba(X))))
+        check("severity_model.predict_proba", diff <= 1e-6, f"max |diff| = {diff:.2e}")
+        check("severity_model feature names", list(clone.feature_names_in_) == names)
+
+    for key in ("production_model", "severity_scaler"):
+        if src.get(key) is None:
+            continue
+        orig, clone = src[key], bundle[key]
+        names = list(orig.feature_names_in_)
+        X = pd.DataFrame(rng.normal(0.0, 3.0, size=(n_samples, len(names))), columns=names)
+        if key == "production_model":
+            diff = float(np.max(np.abs(orig.predict_proba(X) - clone.predict_proba(X))))
+            check("production_model.predict_proba", diff <= 1e-5, f"max |diff| = {diff:.2e}")
+        else:
+            X = X * orig.scale_ + orig.mean_
+            ref = orig.transform(X)
+            diff = float(np.max(np.abs(ref - clone.transform(X)) / (np.abs(ref) + 1.0)))
+            check("severity_scaler.transform", diff <= 1e-4, f"max rel diff = {diff:.2e}")
+
+    if src.get("clinical_bridge") is not None:
+        passed = src["clinical_bridge"].keys() == bundle["clinical_bridge"].keys() and all(
+            np.allclose([v["mean"], v["std"]], [bundle["clinical_bridge"][k]["mean"], bundle["clinical_bridge"][k]["std"]], rtol=1e-6)
+            for k, v in src["clinical_bridge"].items()
+        )
+        check("clinical_bridge", passed)
+    if src.get("healthy_medians") is not None:
+        keys = list(src["healthy_medians"].keys())
+        passed = keys == list(bundle["healthy_medians"].keys()) and np.allclose(
+            [src["healthy_medians"][k] for k in keys], [bundle["healthy_medians"][k] for k in keys], rtol=1e-6
+        )
+        check("healthy_medians", passed)
+    if src.get("feature_names") is not None:
+        check("feature_names", _names(src["feature_names"]) == bundle["feature_names"])
+    if src.get("word_map") is not None:
+        check("word_map", src["word_map"] == bundle["word_map"])
+
+    pickle_paths = [os.path.join(src_dir, n) for n in [*SEVERITY_MODEL_CANDIDATES, *PICKLE_SOURCES.values()]]
+    bundle_paths = [os.path.join(bundle_dir, n) for n in (MANIFEST_NAME, SEVERITY_MODEL_FILE, ARRAYS_FILE)]
+    disk_pickle, disk_bundle = _dir_bytes(pickle_paths), _dir_bytes(bundle_paths)
+
+    def verdict(before, after):
+        return "smaller/faster" if after < 0.95 * before else "larger/slower" if after > 1.05 * before else "no change"
+
+    print("--- LOAD COST (pickles -> bundle, server startup path) ---")
+    print(f"  disk size:     {disk_pickle / 1024:8.1f} KiB -> {disk_bundle / 1024:8.1f} KiB  {verdict(disk_pickle, disk_bundle)}")
+    print(f"  load time:     {t_pickle * 1000:8.1f} ms  -> {t_bundle * 1000:8.1f} ms   {verdict(t_pickle, t_bundle)}")
+    print(f"  python heap:   {mem_pickle / 1024:8.1f} KiB -> {mem_bundle / 1024:8.1f} KiB  {verdict(mem_pickle, mem_bundle)} (retained after load)")
+    print("✅ Bundle matches pickled artifacts." if ok else "❌ Bundle does NOT match pickled artifacts.")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert / verify the Sepsis API artifact bundle.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_export = sub.add_parser("export", help="Convert the joblib pickles into a bundle")
+    p_export.add_argument("--src", default=".")
+    p_export.add_argument("--out", default=DEFAULT_BUNDLE_DIR)
+    p_verify = sub.add_parser("verify", help="Check the bundle against the joblib pickles")
+    p_verify.add_argument("--src", default=".")
+    p_verify.add_argument("--bundle", default=DEFAULT_BUNDLE_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        manifest = export_bundle(args.src, args.out)
+        print(f"✅ SUCCESS: Wrote {len(manifest['artifacts'])} artifacts to {args.out}/")
+        return 0
+    return 0 if verify_bundle(args.src, args.bundle) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
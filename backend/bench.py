@@ -0,0 +1,112 @@
+"""Closed-loop HTTP benchmark for a running Sepsis Prediction API.
+
+Usage (server already running, e.g. via serve.py):
+    python bench.py [--url http://127.0.0.1:8000] [--concurrency 16] [--duration 10]
+
+Cycles through the payloads below and reports requests/s and latency
+percentiles per route. Uses only the standard library.
+"""
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlparse
+
+SEVERITY_PAYLOADS = [
+    # Healthy adult
+    {"HR": 72, "O2Sat": 98, "Temp": 36.8, "SBP": 122, "DBP": 78, "MAP": 93, "Resp": 14,
+     "WBC": 7.5, "Platelets": 260, "Lactate": 0.9, "Creatinine": 0.9, "Glucose": 95, "Age": 45},
+    # Mild sepsis picture
+    {"HR": 108, "O2Sat": 94, "Temp": 38.6, "SBP": 104, "DBP": 64, "MAP": 77, "Resp": 22,
+     "WBC": 14.2, "Platelets": 160, "Lactate": 2.4, "Creatinine": 1.4, "Glucose": 150, "Age": 67},
+    # Septic shock
+    {"HR": 138, "O2Sat": 86, "Temp": 39.4, "SBP": 78, "DBP": 42, "MAP": 54, "Resp": 30,
+     "WBC": 22.0, "Platelets": 80, "Lactate": 5.1, "Creatinine": 2.6, "Glucose": 210, "Age": 74,
+     "SOFA_score": 11},
+]
+WARNING_PAYLOADS = [
+    {"HR": 76, "Temp": 36.9, "SBP": 124, "Lactate": 1.0, "Baseline_Lactate": 1.0, "Creatinine": 0.9},
+    {"HR": 112, "Temp": 38.7, "SBP": 98, "Lactate": 2.6, "Baseline_Lactate": 1.8, "Creatinine": 1.6},
+    {"HR": 134, "Temp": 39.5, "SBP": 82, "Lactate": 4.8, "Baseline_Lactate": 2.2, "Creatinine": 2.4},
+]
+ROUTES = {"/severity": SEVERITY_PAYLOADS, "/sepsis-warning": WARNING_PAYLOADS}
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def run(url, route, payloads, concurrency, duration):
+    target = urlparse(url)
+    bodies = [json.dumps(p).encode() for p in payloads]
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(offset):
+        conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+        local, i = [], offset
+        while time.perf_counter() < deadline:
+            body = bodies[i % len(bodies)]
+            i += 1
+            start = time.perf_counter()
+            ok = False
+            # One retry on a fresh connection when a keep-alive socket was closed by the server
+            # (e.g. a worker retiring during a rolling restart), as urllib3/requests do
+            for _ in range(2):
+                try:
+                    conn.request("POST", route, body=body, headers={"Content-Type": "application/json"})
+                    resp = conn.getresponse()
+                    resp.read()
+                    ok = resp.status == 200
+                    break
+                except (OSError, http.client.HTTPException) as e:
+                    conn.close()
+                    conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+                    if not isinstance(e, (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)):
+                        break
+            if ok:
+                local.append(time.perf_counter() - start)
+            else:
+                with lock:
+                    errors[0] += 1
+        conn.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "route": route,
+        "requests": len(latencies),
+        "errors": errors[0],
+        "req_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark a running Sepsis Prediction API.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per route")
+    parser.add_argument("--route", choices=sorted(ROUTES), action="append")
+    args = parser.parse_args(argv)
+
+    for route in args.route or sorted(ROUTES):
+        print(json.dumps(run(args.url, route, ROUTES[route], args.concurrency, args.duration)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Streaming input-drift monitor for /severity.
+
+Each scored input is folded into a fixed-size, mergeable histogram per
+feature, binned in z-space against a training reference in raw clinical
+units (the clinical_bridge mean/std). Features without such a reference are
+not tracked. Values that are not finite numbers are ignored. Nothing raw is
+stored, so memory is constant regardless of traffic.
+
+On every ``roll()`` (called on a schedule by main.py) the current window is
+summarised into PSI / mean-shift / out-of-range figures, merged into the
+lifetime sketch and reset.
+
+``state()`` is a JSON-able snapshot of the sketches and ``merge()`` adds one
+(or another monitor) in, which is how serve.py workers combine their views.
+"""
+import math
+import time
+
+# PSI is undefined for empty bins; use the usual small-probability floor
+_PSI_EPS = 1e-4
+
+
+def _normal_cdf(z):
+    return 0.5 * (1.0 + math.erf(z / math.sqrt(2.0)))
+
+
+class FeatureSketch:
+    """Fixed-bin z-score histogram with underflow/overflow bins and running moments."""
+
+    __slots__ = ("counts", "n", "z_sum", "z_sq_sum")
+
+    def __init__(self, n_bins):
+        self.counts = [0] * (n_bins + 2)
+        self.n = 0
+        self.z_sum = 0.0
+        self.z_sq_sum = 0.0
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.n += other.n
+        self.z_sum += other.z_sum
+        self.z_sq_sum += other.z_sq_sum
+        return self
+
+    def copy(self):
+        clone = FeatureSketch(len(self.counts) - 2)
+        return clone.merge(self)
+
+    def to_list(self):
+        return [self.counts, self.n, self.z_sum, self.z_sq_sum]
+
+    @classmethod
+    def from_list(cls, values):
+        counts, n, z_sum, z_sq_sum = values
+        sketch = cls(len(counts) - 2)
+        sketch.counts = list(counts)
+        sketch.n, sketch.z_sum, sketch.z_sq_sum = n, z_sum, z_sq_sum
+        return sketch
+
+
+class DriftMonitor:
+    def __init__(self, reference, aliases=None, z_range=4.0, n_bins=32):
+        """``reference`` maps feature -> (mean, std); ``aliases`` maps input keys to features."""
+        self.z_range = float(z_range)
+        self.n_bins = int(n_bins)
+        self._bin_scale = self.n_bins / (2.0 * self.z_range)
+        self._reference = {}
+        for name, (mean, std) in reference.items():
+            std = float(std) if std else 1.0
+            self._reference[name] = (float(mean), std, 1.0 / std)
+
+        # Input key -> feature; several UI keys can alias one column, the first one wins
+        self._keys = {}
+        for key, name in (aliases or {}).items():
+            if name in self._reference and name not in self._keys.values():
+                self._keys[key] = name
+        for name in self._reference:
+            self._keys.setdefault(name, name)
+
+        edges = [-self.z_range + i / self._bin_scale for i in range(self.n_bins + 1)]
+        cdf = [_normal_cdf(e) for e in edges]
+        self._expected = [cdf[0]] + [b - a for a, b in zip(cdf, cdf[1:])] + [1.0 - cdf[-1]]
+
+        self._window = self._empty()
+        self._lifetime = self._empty()
+        self._last_window = None
+        self._window_started = time.time()
+        self.last_report = None
+
+    def _empty(self):
+        return {name: FeatureSketch(self.n_bins) for name in self._reference}
+
+    def observe(self, values):
+        """Fold one input dict (``{key: value}``) into the current window."""
+        last = self.n_bins + 1
+        for key, value in values.items():
+            name = self._keys.get(key)
+            # Extra client keys can carry anything (e.g. "1.2 mg/dL"); only count real numbers
+            if name is None or isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            if not math.isfinite(value):
+                continue
+            mean, _, inv_std = self._reference[name]
+            z = (value - mean) * inv_std
+            if z < -self.z_range:
+                b = 0
+            elif z >= self.z_range:
+                b = last
+            else:
+                b = int((z + self.z_range) * self._bin_scale) + 1
+            sketch = self._window[name]
+            sketch.counts[b] += 1
+            sketch.n += 1
+            sketch.z_sum += z
+            sketch.z_sq_sum += z * z
+
+    def state(self):
+        """JSON-able snapshot of the open window, last closed window and lifetime sketches."""
+        def dump(sketches):
+            return None if sketches is None else {name: s.to_list() for name, s in sketches.items()}
+
+        return {
+            "window_started": self._window_started,
+            "window": dump(self._window),
+            "last_window": dump(self._last_window),
+            "lifetime": dump(self._lifetime),
+        }
+
+    def merge(self, other):
+        """Merge another monitor, or a ``state()`` snapshot of one (e.g. from a different worker).
+
+        Windows are added as-is; workers roll on their own schedule, so a
+        merged window spans roughly, not exactly, one interval.
+        """
+        state = other.state() if isinstance(other, DriftMonitor) else other
+        for part in ("window", "lifetime", "last_window"):
+            sketches = state.get(part)
+            if not sketches:
+                continue
+            if part == "last_window" and self._last_window is None:
+                self._last_window = self._empty()
+            target = getattr(self, f"_{part}")
+            for name, values in sketches.items():
+                if name in target:
+                    target[name].merge(FeatureSketch.from_list(values))
+        self._window_started = min(self._window_started, state.get("window_started", self._window_started))
+        return self
+
+    def _summarise(self, sketches):
+        features = {}
+        total = 0
+        total_oor = 0
+        for name, sketch in sketches.items():
+            if sketch.n == 0:
+                continue
+            mean, std, _ = self._reference[name]
+            psi = 0.0
+            for count, expected in zip(sketch.counts, self._expected):
+                actual = max(count / sketch.n, _PSI_EPS)
+                expected = max(expected, _PSI_EPS)
+                psi += (actual - expected) * math.log(actual / expected)
+            z_mean = sketch.z_sum / sketch.n
+            z_var = max(sketch.z_sq_sum / sketch.n - z_mean * z_mean, 0.0)
+            oor = sketch.counts[0] + sketch.counts[-1]
+            total += sketch.n
+            total_oor += oor
+            features[name] = {
+                "n": sketch.n,
+                "psi": round(psi, 4),
+                "mean_shift_std": round(z_mean, 4),
+                "std_ratio": round(math.sqrt(z_var), 4),
+                "live_mean": round(mean + z_mean * std, 4),
+                "reference_mean": mean,
+                "reference_std": std,
+                "out_of_range_fraction": round(oor / sketch.n, 4),
+            }
+        return {
+            "observations": total,
+            "out_of_range_fraction": round(total_oor / total, 4) if total else 0.0,
+            "features": features,
+        }
+
+    def roll(self):
+        """Close the current window: summarise it, merge into lifetime, reset."""
+        now = time.time()
+        window = self._window
+        self._window = self._empty()
+        for name, sketch in window.items():
+            self._lifetime[name].merge(sketch)
+        self._last_window = window
+        self.last_report = {
+            "window_start": self._window_started,
+            "window_end": now,
+            "window": self._summarise(window),
+            "lifetime": self._summarise(self._lifetime),
+        }
+        self._window_started = now
+        return self.last_report
+
+    def report(self):
+        """Latest scheduled report plus a live view of the open window."""
+        lifetime = {name: sketch.copy().merge(self._window[name]) for name, sketch in self._lifetime.items()}
+        return {
+            "z_range": self.z_range,
+            "n_bins": self.n_bins,
+            "tracked_features": list(self._reference),
+            "last_window": self._summarise(self._last_window) if self._last_window is not None else None,
+            "current_window": self._summarise(self._window),
+            "lifetime": self._summarise(lifetime),
+        }
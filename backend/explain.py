@@ -0,0 +1,237 @@
+"""Per-patient feature attribution for the severity model.
+
+Uses XGBoost's native tree contribution computation (``pred_contribs``:
+Saabas with the default ``method="approx"``, or exact TreeSHAP, which costs
+several ms per row on the severity model) instead of a model-agnostic
+explainer. Concurrent requests are collected for a short window and
+explained in batched calls on a worker thread, one batch at a time, sized
+from the measured per-row cost so a batch fits in half the budget. Results
+are cached by feature-vector hash, and each request waits at most
+``budget_ms``.
+
+Explanations share the CPU with scoring, so no work is done for callers that
+have given up: every queued row carries its deadline, and rows that can no
+longer finish in time are dropped before each batch. The queue only admits
+as many rows as fit in one budget at the measured cost (capped by
+``max_queue``); beyond that, requests are answered "overloaded" immediately.
+
+Contributions are in the model's margin (log-odds) space for the explained
+class and, with the bias term, sum to that class's raw score.
+"""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# stats() keys that add up / take the maximum across workers in merge_stats()
+_SUMMED_STATS = ("requests", "cache_hits", "timeouts", "overloaded", "expired", "errors", "batches",
+                 "batched_rows", "queued", "cache_entries")
+_MAX_STATS = ("max_batch", "max_latency_ms")
+
+
+class SeverityExplainer:
+    def __init__(self, model, feature_names, display_names=None, budget_ms=50.0,
+                 batch_window_ms=2.0, max_batch=256, max_queue=1024, cache_size=4096, method="approx"):
+        if method not in ("exact", "approx"):
+            raise ValueError(f"Unknown explanation method: {method!r}")
+        self.booster = model.get_booster() if hasattr(model, "get_booster") else model
+        self.feature_names = list(feature_names)
+        self.display_names = [(display_names or {}).get(n, n) for n in self.feature_names]
+        self.budget_ms = float(budget_ms)
+        self.batch_window_s = float(batch_window_ms) / 1000.0
+        self.max_batch = int(max_batch)
+        self.max_queue = int(max_queue)
+        self.cache_size = int(cache_size)
+        self.method = method
+        self._row_cost_s = None  # EWMA of seconds per explained row
+        self._cache = OrderedDict()  # vector hash -> contributions (n_classes, n_features + 1)
+        self._pending = OrderedDict()  # key -> [row, future, deadline]; deadline is the latest waiter's
+        self._in_flight = {}  # key -> future, so duplicate vectors share one computation
+        self._flush_handle = None
+        self._runner = None
+        self._stats = {"requests": 0, "cache_hits": 0, "timeouts": 0, "overloaded": 0, "expired": 0, "errors": 0,
+                       "batches": 0, "batched_rows": 0, "max_batch": 0, "max_latency_ms": 0.0}
+
+    @staticmethod
+    def _key(row):
+        return hashlib.blake2b(np.ascontiguousarray(row, dtype=np.float32).tobytes(), digest_size=16).digest()
+
+    def contributions(self, X):
+        """Native tree contributions, shape (n, n_classes, n_features + 1)."""
+        import xgboost as xgb
+
+        dmat = xgb.DMatrix(np.asarray(X, dtype=np.float32), feature_names=self.feature_names)
+        contribs = self.booster.predict(dmat, pred_contribs=True, approx_contribs=self.method == "approx")
+        if contribs.ndim == 2:  # binary / regression: single output
+            contribs = contribs[:, None, :]
+        return contribs
+
+    def warm_up(self, rows=8):
+        """Trigger lazy init and seed the per-row cost estimate used to size batches."""
+        X = np.zeros((rows, len(self.feature_names)), dtype=np.float32)
+        self.contributions(X)
+        started = time.perf_counter()
+        self.contributions(X)
+        self._row_cost_s = (time.perf_counter() - started) / rows
+
+    def _batch_limit(self):
+        if not self._row_cost_s:
+            return self.max_batch
+        return max(1, min(self.max_batch, int(0.5 * self.budget_ms / 1000.0 / self._row_cost_s)))
+
+    def _queue_limit(self):
+        # Rows beyond one budget's worth of work would only time out
+        if not self._row_cost_s:
+            return self.max_queue
+        return max(1, min(self.max_queue, int(self.budget_ms / 1000.0 / self._row_cost_s)))
+
+    def _cache_put(self, key, value):
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _schedule_flush(self, loop):
+        self._flush_handle = None
+        if self._runner is None or self._runner.done():
+            self._runner = loop.create_task(self._drain())
+
+    def _drop_expired(self):
+        """Drop queued rows that can't finish before their deadline; their waiters see a timeout."""
+        finish = time.perf_counter() + (self._row_cost_s or 0.0)
+        for key in [k for k, (_, _, deadline) in self._pending.items() if deadline < finish]:
+            _, fut, _ = self._pending.pop(key)
+            self._in_flight.pop(key, None)
+            self._stats["expired"] += 1
+            if not fut.done():
+                fut.set_result(None)
+
+    async def _drain(self):
+        # One batch at a time: parallel batches would only compete for the same cores
+        while True:
+            self._drop_expired()
+            if not self._pending:
+                return
+            limit = self._batch_limit()
+            batch = []
+            while self._pending and len(batch) < limit:
+                key, (row, fut, _) = self._pending.popitem(last=False)
+                batch.append((key, row, fut))
+            await self._run_batch(batch)
+
+    async def _run_batch(self, batch):
+        X = np.vstack([row for _, row, _ in batch])
+        started = time.perf_counter()
+        try:
+            contribs = await asyncio.to_thread(self.contributions, X)
+        except Exception as e:
+            self._stats["errors"] += 1
+            for key, _, fut in batch:
+                self._in_flight.pop(key, None)
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        cost = (time.perf_counter() - started) / len(batch)
+        self._row_cost_s = cost if self._row_cost_s is None else 0.8 * self._row_cost_s + 0.2 * cost
+        self._stats["batches"] += 1
+        self._stats["batched_rows"] += len(batch)
+        self._stats["max_batch"] = max(self._stats["max_batch"], len(batch))
+        for i, (key, _, fut) in enumerate(batch):
+            self._cache_put(key, contribs[i])
+            self._in_flight.pop(key, None)
+            if not fut.done():
+                fut.set_result(contribs[i])
+
+    def _format(self, contribs, row, class_index, top_k, values, status, started):
+        class_contribs = contribs[min(class_index, contribs.shape[0] - 1)]
+        feature_contribs = class_contribs[:-1]
+        order = np.argsort(-np.abs(feature_contribs))[: max(0, int(top_k))]
+        latency_ms = (time.perf_counter() - started) * 1000
+        self._stats["max_latency_ms"] = max(self._stats["max_latency_ms"], latency_ms)
+        return {
+            "status": status,
+            "class_index": int(class_index),
+            "bias": round(float(class_contribs[-1]), 4),
+            "top_features": [
+                {
+                    "feature": self.display_names[i],
+                    "model_feature": self.feature_names[i],
+                    "value": values.get(self.display_names[i], float(row[i])),
+                    "contribution": round(float(feature_contribs[i]), 4),
+                }
+                for i in order
+            ],
+            "latency_ms": round(latency_ms, 3),
+            "budget_ms": self.budget_ms,
+        }
+
+    async def explain(self, row, class_index, top_k=5, values=None):
+        """Top-``top_k`` drivers of ``class_index`` for one model-space feature vector."""
+        started = time.perf_counter()
+        row = np.ascontiguousarray(row, dtype=np.float32).reshape(1, -1)
+        values = values or {}
+        self._stats["requests"] += 1
+        key = self._key(row)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self._stats["cache_hits"] += 1
+            return self._format(cached, row[0], class_index, top_k, values, "cached", started)
+
+        deadline = started + self.budget_ms / 1000.0
+        fut = self._in_flight.get(key)
+        if fut is None:
+            if len(self._pending) >= self._queue_limit():
+                self._stats["overloaded"] += 1
+                return {"status": "overloaded", "budget_ms": self.budget_ms,
+                        "latency_ms": round((time.perf_counter() - started) * 1000, 3), "top_features": []}
+            loop = asyncio.get_running_loop()
+            fut = loop.create_future()
+            self._in_flight[key] = fut
+            self._pending[key] = [row, fut, deadline]
+            if self._flush_handle is None and (self._runner is None or self._runner.done()):
+                self._flush_handle = loop.call_later(self.batch_window_s, self._schedule_flush, loop)
+        elif key in self._pending:
+            # Same vector still queued: keep it as long as the newest waiter needs it
+            self._pending[key][2] = max(self._pending[key][2], deadline)
+
+        try:
+            contribs = await asyncio.wait_for(asyncio.shield(fut), timeout=self.budget_ms / 1000.0)
+        except asyncio.TimeoutError:
+            contribs = None
+        except Exception as e:
+            return {"status": "error", "detail": str(e), "budget_ms": self.budget_ms, "top_features": []}
+        if contribs is None:  # budget ran out, or the row was dropped because it couldn't make it
+            self._stats["timeouts"] += 1
+            return {"status": "timeout", "budget_ms": self.budget_ms,
+                    "latency_ms": round((time.perf_counter() - started) * 1000, 3), "top_features": []}
+        return self._format(contribs, row[0], class_index, top_k, values, "ok", started)
+
+    def stats(self):
+        s = dict(self._stats)
+        s["budget_ms"] = self.budget_ms
+        s["method"] = self.method
+        s["row_cost_ms"] = round(self._row_cost_s * 1000, 3) if self._row_cost_s else None
+        s["batch_limit"] = self._batch_limit()
+        s["queue_limit"] = self._queue_limit()
+        s["queued"] = len(self._pending)
+        s["batch_window_ms"] = self.batch_window_s * 1000.0
+        s["cache_entries"] = len(self._cache)
+        s["cache_size"] = self.cache_size
+        s["max_latency_ms"] = round(s["max_latency_ms"], 3)
+        return s
+
+
+def merge_stats(stats_list):
+    """Combine ``SeverityExplainer.stats()`` from several workers; the first one supplies the settings."""
+    merged = dict(stats_list[0])
+    for other in stats_list[1:]:
+        for key in _SUMMED_STATS:
+            merged[key] = merged.get(key, 0) + other.get(key, 0)
+        for key in _MAX_STATS:
+            merged[key] = max(merged.get(key, 0), other.get(key, 0))
+    merged["workers"] = len(stats_list)
+    return merged
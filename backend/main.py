@@ -1,10 +1,24 @@
+import time
+# Per-process start for time_to_ready_s; serve.py workers reset it at fork
+_PROCESS_START = time.perf_counter()
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-import joblib
-import pandas as pd
+from fastapi.responses import JSONResponse
 import numpy as np
 from pydantic import BaseModel, ConfigDict
 import os
+import asyncio
+import contextvars
+import hashlib
+import json
+import threading
+# pandas, joblib, sklearn and xgboost are imported lazily by the artifact loaders / scoring
+# paths so that liveness routes come up before the heavy libraries are loaded.
+from artifacts import DEFAULT_BUNDLE_DIR, MANIFEST_NAME, file_sha256, load_bundle, stale_sources
+from vitals_surrogate import DEFAULT_LUT_PATH, VitalsLookupTable, parse_grid
+from drift_monitor import DriftMonitor
+from explain import SeverityExplainer, merge_stats
 
 # Add SepsisPredictor class for loading the early warning models
 class SepsisPredictor:
@@ -105,85 +119,138 @@ healthy_medians = None
 clinical_bridge = None
 sepsis_decision_engine = None
 base_vitals_model = None
+base_vitals_model_tag = ""
+vitals_lut = None
+artifact_bundle = None
+
+# Optional lookup-table surrogate for base_vitals_model (see vitals_surrogate.py)
+VITALS_LUT_ENABLED = os.environ.get("SEPSIS_VITALS_LUT", "0") == "1"
+VITALS_LUT_GRID = os.environ.get("SEPSIS_VITALS_LUT_GRID", "")
+VITALS_LUT_MAX_ERROR = float(os.environ.get("SEPSIS_VITALS_LUT_MAX_ERROR", "0.05"))
+VITALS_LUT_PATH = DEFAULT_LUT_PATH
+
+# Input drift monitoring for /severity (see drift_monitor.py)
+drift_monitor = None
+DRIFT_INTERVAL_S = float(os.environ.get("SEPSIS_DRIFT_INTERVAL_S", "60"))
+
+# serve.py workers publish drift / explainer snapshots here so any worker can report for all of them
+WORKER_STATS_DIR = os.environ.get("SEPSIS_WORKER_STATS_DIR", "")
+WORKER_STATS_INTERVAL_S = float(os.environ.get("SEPSIS_WORKER_STATS_INTERVAL_S", "5"))
+
+# Per-patient feature attribution for /severity?explain=true (see explain.py)
+severity_explainer = None
+EXPLAIN_BUDGET_MS = float(os.environ.get("SEPSIS_EXPLAIN_BUDGET_MS", "50"))
+EXPLAIN_BATCH_WINDOW_MS = float(os.environ.get("SEPSIS_EXPLAIN_BATCH_WINDOW_MS", "2"))
+EXPLAIN_CACHE_SIZE = int(os.environ.get("SEPSIS_EXPLAIN_CACHE_SIZE", "4096"))
+EXPLAIN_METHOD = os.environ.get("SEPSIS_EXPLAIN_METHOD", "approx")  # "approx" (Saabas) or "exact" (TreeSHAP)
 
 # 4. Load Artifacts (Optimized for Bridge Scaling)
-try:
-    if os.path.exists("sepsis_honest_73_balanced.pkl"):
-        severity_model = joblib.load("sepsis_honest_73_balanced.pkl")
-        print("✅ SUCCESS: Loaded Severity Model: sepsis_honest_73_balanced.pkl")
-    elif os.path.exists("sepsis_balanced_70_70.pkl"):
-        severity_model = joblib.load("sepsis_balanced_70_70.pkl")
-        print("✅ SUCCESS: Loaded Severity Model: sepsis_balanced_70_70.pkl")
-    elif os.path.exists("sepsis_severity_model_FINAL_3CLASS.pkl"):
-        severity_model = joblib.load("sepsis_severity_model_FINAL_3CLASS.pkl")
-        print("✅ SUCCESS: Loaded Severity Model: sepsis_severity_model_FINAL_3CLASS.pkl")
-    else:
-        print("❌ CRITICAL: No severity model found (expected sepsis_balanced_70_70.pkl).")
+# Prefer the compact, pickle-free bundle (see artifacts.py); fall back to the joblib pickles,
+# including when they were replaced (e.g. retrained) after the bundle was exported.
+def _load_model_artifacts():
+    global severity_model, severity_feature_names, severity_scaler, healthy_medians, clinical_bridge
+    global sepsis_decision_engine, base_vitals_model, base_vitals_model_tag, artifact_bundle
+    import joblib
 
-    if os.path.exists("sepsis_scaler.pkl"):
+    if os.path.exists(os.path.join(DEFAULT_BUNDLE_DIR, MANIFEST_NAME)):
         try:
-            severity_scaler = joblib.load("sepsis_scaler.pkl")
-            print("✅ SUCCESS: Loaded Severity Scaler: sepsis_scaler.pkl")
+            stale = stale_sources(DEFAULT_BUNDLE_DIR)
+            if stale:
+                raise ValueError(f"out of date with {', '.join(stale)}; re-run `python artifacts.py export`")
+            # Bundle checksums are checked at export / deploy time (`python artifacts.py verify`)
+            artifact_bundle = load_bundle(DEFAULT_BUNDLE_DIR, verify_checksums=False)
+            severity_model = artifact_bundle["severity_model"]
+            severity_scaler = artifact_bundle["severity_scaler"]
+            healthy_medians = artifact_bundle["healthy_medians"]
+            clinical_bridge = artifact_bundle["clinical_bridge"]
+            print(f"✅ SUCCESS: Loaded Artifact Bundle: {DEFAULT_BUNDLE_DIR}/")
         except Exception as e:
-            print(f"⚠️ WARNING: Could not load sepsis_scaler.pkl: {e}")
+            artifact_bundle = None
+            print(f"⚠️ WARNING: Could not load artifact bundle, using pickles: {e}")
 
-    if os.path.exists("healthy_medians.pkl"):
-        try:
-            healthy_medians = joblib.load("healthy_medians.pkl")
-            print("✅ SUCCESS: Loaded Healthy Medians: healthy_medians.pkl")
-        except Exception as e:
-            print(f"⚠️ WARNING: Could not load healthy_medians.pkl: {e}")
+    try:
+        if severity_model is not None:
+            pass
+        elif os.path.exists("sepsis_honest_73_balanced.pkl"):
+            severity_model = joblib.load("sepsis_honest_73_balanced.pkl")
+            print("✅ SUCCESS: Loaded Severity Model: sepsis_honest_73_balanced.pkl")
+        elif os.path.exists("sepsis_balanced_70_70.pkl"):
+            severity_model = joblib.load("sepsis_balanced_70_70.pkl")
+            print("✅ SUCCESS: Loaded Severity Model: sepsis_balanced_70_70.pkl")
+        elif os.path.exists("sepsis_severity_model_FINAL_3CLASS.pkl"):
+            severity_model = joblib.load("sepsis_severity_model_FINAL_3CLASS.pkl")
+            print("✅ SUCCESS: Loaded Severity Model: sepsis_severity_model_FINAL_3CLASS.pkl")
+        else:
+            print("❌ CRITICAL: No severity model found (expected sepsis_balanced_70_70.pkl).")
+
+        if severity_scaler is None and os.path.exists("sepsis_scaler.pkl"):
+            try:
+                severity_scaler = joblib.load("sepsis_scaler.pkl")
+                print("✅ SUCCESS: Loaded Severity Scaler: sepsis_scaler.pkl")
+            except Exception as e:
+                print(f"⚠️ WARNING: Could not load sepsis_scaler.pkl: {e}")
+
+        if healthy_medians is None and os.path.exists("healthy_medians.pkl"):
+            try:
+                healthy_medians = joblib.load("healthy_medians.pkl")
+                print("✅ SUCCESS: Loaded Healthy Medians: healthy_medians.pkl")
+            except Exception as e:
+                print(f"⚠️ WARNING: Could not load healthy_medians.pkl: {e}")
+
+        if clinical_bridge is None and os.path.exists("clinical_bridge.pkl"):
+            try:
+                clinical_bridge = joblib.load("clinical_bridge.pkl")
+                print("✅ SUCCESS: Loaded Clinical Bridge: clinical_bridge.pkl")
+            except Exception as e:
+                print(f"⚠️ WARNING: Could not load clinical_bridge.pkl: {e}")
 
-    if os.path.exists("clinical_bridge.pkl"):
         try:
-            clinical_bridge = joblib.load("clinical_bridge.pkl")
-            print("✅ SUCCESS: Loaded Clinical Bridge: clinical_bridge.pkl")
-        except Exception as e:
-            print(f"⚠️ WARNING: Could not load clinical_bridge.pkl: {e}")
+            if severity_model is not None and hasattr(severity_model, "feature_names_in_"):
+                severity_feature_names = list(getattr(severity_model, "feature_names_in_"))
+        except Exception:
+            severity_feature_names = None
+        try:
+            if severity_feature_names is None and severity_model is not None and hasattr(severity_model, "get_booster"):
+                severity_feature_names = severity_model.get_booster().feature_names
+        except Exception:
+            severity_feature_names = None
+        if not severity_feature_names and isinstance(healthy_medians, dict):
+            severity_feature_names = list(healthy_medians.keys())
+        if not severity_feature_names and artifact_bundle is not None and artifact_bundle["feature_names"]:
+            severity_feature_names = artifact_bundle["feature_names"]
+        if not severity_feature_names and os.path.exists("feature_names.pkl"):
+            severity_feature_names = joblib.load("feature_names.pkl")
+        if severity_feature_names:
+            print(f"✅ SUCCESS: Severity feature count = {len(severity_feature_names)}")
+    except Exception as e:
+        print(f"❌ ERROR: Artifact loading failed: {e}")
 
+    # Load Sepsis Early Warning System Models
     try:
-        if severity_model is not None and hasattr(severity_model, "feature_names_in_"):
-            severity_feature_names = list(getattr(severity_model, "feature_names_in_"))
-    except Exception:
-        severity_feature_names = None
-    try:
-        if severity_feature_names is None and severity_model is not None and hasattr(severity_model, "get_booster"):
-            severity_feature_names = severity_model.get_booster().feature_names
-    except Exception:
-        severity_feature_names = None
-    if not severity_feature_names and isinstance(healthy_medians, dict):
-        severity_feature_names = list(healthy_medians.keys())
-    if not severity_feature_names and os.path.exists("feature_names.pkl"):
-        severity_feature_names = joblib.load("feature_names.pkl")
-    if severity_feature_names:
-        print(f"✅ SUCCESS: Severity feature count = {len(severity_feature_names)}")
-except Exception as e:
-    print(f"❌ ERROR: Artifact loading failed: {e}")
-
-# Load Sepsis Early Warning System Models
-try:
-    if os.path.exists("sepsis_decision_engine.pkl"):
-        try:
-            sepsis_decision_engine = joblib.load("sepsis_decision_engine.pkl")
-            print("✅ SUCCESS: Loaded Sepsis Decision Engine.")
-        except Exception as e:
-            print(f"⚠️ WARNING: Could not load sepsis_decision_engine.pkl: {e}")
-            # Create fallback decision engine
-            sepsis_decision_engine = None
+        if os.path.exists("sepsis_decision_engine.pkl"):
+            try:
+                sepsis_decision_engine = joblib.load("sepsis_decision_engine.pkl")
+                print("✅ SUCCESS: Loaded Sepsis Decision Engine.")
+            except Exception as e:
+                print(f"⚠️ WARNING: Could not load sepsis_decision_engine.pkl: {e}")
+                # Create fallback decision engine
+                sepsis_decision_engine = None
     
-    base_vitals_candidates = ["base_vitals_model.pkl", "base_vitals_model .pkl"]
-    base_vitals_path = next((p for p in base_vitals_candidates if os.path.exists(p)), None)
-    if base_vitals_path:
-        try:
-            base_vitals_model = joblib.load(base_vitals_path)
-            print(f"✅ SUCCESS: Loaded Base Vitals Model: {base_vitals_path}")
-        except Exception as e:
-            print(f"⚠️ WARNING: Could not load base_vitals_model ({base_vitals_path}): {e}")
-            base_vitals_model = None
-    else:
-        print("⚠️ WARNING: base_vitals_model not found (expected base_vitals_model.pkl)")
-except Exception as e:
-    print(f"⚠️ WARNING: Sepsis Early Warning models loading failed: {e}")
+        base_vitals_candidates = ["base_vitals_model.pkl", "base_vitals_model .pkl"]
+        base_vitals_path = next((p for p in base_vitals_candidates if os.path.exists(p)), None)
+        if base_vitals_path:
+            try:
+                base_vitals_model = joblib.load(base_vitals_path)
+                base_vitals_model_tag = file_sha256(base_vitals_path)
+                print(f"✅ SUCCESS: Loaded Base Vitals Model: {base_vitals_path}")
+            except Exception as e:
+                print(f"⚠️ WARNING: Could not load base_vitals_model ({base_vitals_path}): {e}")
+                base_vitals_model = None
+        else:
+            print("⚠️ WARNING: base_vitals_model not found (expected base_vitals_model.pkl)")
+    except Exception as e:
+        print(f"⚠️ WARNING: Sepsis Early Warning models loading failed: {e}")
+
 
 # 5. Data Schema
 class PatientData(BaseModel):
@@ -321,10 +388,225 @@ _EARLY_VITALS_DEFAULTS = {
     "Resp": 16.0,
 }
 
+
+def _early_vitals_columns():
+    """Input keys for base_vitals_model, in the model's column order."""
+    base_feature_names = getattr(base_vitals_model, 'feature_names_in_', None) if base_vitals_model is not None else None
+    base_expected = getattr(base_vitals_model, 'n_features_in_', None) if base_vitals_model is not None else None
+    if base_feature_names is not None and len(base_feature_names) > 0:
+        return [str(name) for name in base_feature_names]
+    if base_expected is not None and int(base_expected) == 7:
+        return ["HR", "Temp", "SBP", "DBP", "MAP", "O2Sat", "Resp"]
+    return ["HR", "Temp", "SBP"]
+
+
+def _early_vitals_input(hr, temp, sbp):
+    """Build base_vitals_model inputs for arrays of HR/Temp/SBP; other vitals come from _EARLY_VITALS_DEFAULTS."""
+    hr = np.asarray(hr, dtype=float)
+    temp = np.asarray(temp, dtype=float)
+    sbp = np.asarray(sbp, dtype=float)
+
+    # Derive MAP and shock index from the varying inputs
+    default_dbp = np.full_like(hr, float(_EARLY_VITALS_DEFAULTS["DBP"]))
+    o2sat = np.full_like(hr, float(_EARLY_VITALS_DEFAULTS["O2Sat"]))
+    resp = np.full_like(hr, float(_EARLY_VITALS_DEFAULTS["Resp"]))
+    map_calc = (sbp + 2.0 * default_dbp) / 3.0
+    shock_index = np.divide(hr, sbp, out=np.zeros_like(hr), where=sbp != 0)
+
+    vitals_candidates = {
+        # UI keys
+        "HR": hr,
+        "Temp": temp,
+        "SBP": sbp,
+        "DBP": default_dbp,
+        "MAP": map_calc,
+        "O2Sat": o2sat,
+        "Resp": resp,
+        "Shock_Index": shock_index,
+        "shock_index": shock_index,
+        "MAP_Calc": map_calc,
+        # common training column names
+        "heart_rate": hr,
+        "temperature": temp,
+        "systolic_bp": sbp,
+        "diastolic_bp": default_dbp,
+        "mean_bp": map_calc,
+        "oxygen_saturation": o2sat,
+        "respiratory_rate": resp,
+        "map": map_calc,
+        "sbp": sbp,
+        "hr": hr,
+    }
+
+    return np.column_stack([vitals_candidates.get(name, np.zeros_like(hr)) for name in _early_vitals_columns()])
+
+
+def _base_vitals_probs(vitals_input):
+    """Positive-class probability from base_vitals_model for each row."""
+    probs = base_vitals_model.predict_proba(vitals_input)
+    return probs[:, 1] if probs.shape[1] > 1 else probs[:, 0]
+
+
+def _base_vitals_probs_for(hr, temp, sbp):
+    return _base_vitals_probs(_early_vitals_input(hr, temp, sbp))
+
+
+def _vitals_lut_tag():
+    """Identity of what a lookup table bakes in: the model file, the fixed vitals and the column layout."""
+    spec = {"model": base_vitals_model_tag, "defaults": _EARLY_VITALS_DEFAULTS, "columns": _early_vitals_columns()}
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+
+
+# Precompute the vitals_prob lookup table (reused from disk when built for the same model and inputs)
+def _build_vitals_lut():
+    global vitals_lut
+    vitals_lut = None
+    if VITALS_LUT_ENABLED and base_vitals_model is not None and hasattr(base_vitals_model, "predict_proba"):
+        try:
+            lut_grid = parse_grid(VITALS_LUT_GRID)
+            lut_tag = _vitals_lut_tag()
+            if os.path.exists(VITALS_LUT_PATH) and not lut_grid:
+                vitals_lut = VitalsLookupTable.load(VITALS_LUT_PATH)
+                if vitals_lut.model_tag != lut_tag:
+                    print(f"⚠️ WARNING: {VITALS_LUT_PATH} was built for a different base_vitals_model or vitals inputs; rebuilding")
+                    vitals_lut = None
+            if vitals_lut is None:
+                vitals_lut = VitalsLookupTable.build(_base_vitals_probs_for, lut_grid, model_tag=lut_tag)
+            if vitals_lut.max_error is None or vitals_lut.max_error > VITALS_LUT_MAX_ERROR:
+                print(f"⚠️ WARNING: Vitals lookup table max error {vitals_lut.max_error} exceeds {VITALS_LUT_MAX_ERROR}; using base_vitals_model")
+                vitals_lut = None
+            else:
+                print(f"✅ SUCCESS: Vitals lookup table ready: {vitals_lut.summary()}")
+        except Exception as e:
+            vitals_lut = None
+            print(f"⚠️ WARNING: Vitals lookup table disabled: {e}")
+
+
+# Training reference for drift: the clinical bridge, the only statistics in raw clinical units.
+# (sepsis_scaler / healthy_medians were fitted on already-normalised data, so they can't be
+# compared with what clients send.)
+def _drift_reference():
+    reference = {}
+    if isinstance(clinical_bridge, dict):
+        for name, stats in clinical_bridge.items():
+            try:
+                reference[name] = (float(stats.get('mean')), float(stats.get('std')))
+            except Exception:
+                continue
+    return reference
+
+
+def _build_drift_monitor():
+    global drift_monitor
+    drift_ref = _drift_reference()
+    if drift_ref:
+        drift_monitor = DriftMonitor(drift_ref, aliases=UI_MAP)
+        print(f"✅ SUCCESS: Drift monitor tracking {len(drift_ref)} features (report every {DRIFT_INTERVAL_S:g}s)")
+    else:
+        print("⚠️ WARNING: No clinical_bridge statistics; drift monitor disabled")
+
+
+def _build_severity_explainer():
+    global severity_explainer
+    if severity_model is None or not severity_feature_names or not hasattr(severity_model, "get_booster"):
+        print("⚠️ WARNING: Severity model has no native tree contributions; explanations disabled")
+        return
+    # Model column -> UI key, so drivers are reported with the names the frontend sends
+    display_names = {}
+    for ui_key, col in UI_MAP.items():
+        display_names.setdefault(col, ui_key)
+    for name in severity_feature_names:
+        if name in UI_MAP:
+            display_names[name] = name
+    severity_explainer = SeverityExplainer(
+        severity_model,
+        severity_feature_names,
+        display_names=display_names,
+        budget_ms=EXPLAIN_BUDGET_MS,
+        batch_window_ms=EXPLAIN_BATCH_WINDOW_MS,
+        cache_size=EXPLAIN_CACHE_SIZE,
+        method=EXPLAIN_METHOD,
+    )
+    print(f"✅ SUCCESS: Severity explainer ready ({EXPLAIN_METHOD}, budget {EXPLAIN_BUDGET_MS:g} ms)")
+
+
+@app.on_event("startup")
+async def _start_drift_monitor():
+    if DRIFT_INTERVAL_S <= 0:
+        return
+
+    async def _roll_periodically():
+        while True:
+            await asyncio.sleep(DRIFT_INTERVAL_S)
+            if drift_monitor is None:
+                continue
+            try:
+                drift_monitor.roll()
+            except Exception as e:
+                print(f"⚠️ WARNING: Drift report failed: {e}")
+
+    app.state.drift_task = asyncio.create_task(_roll_periodically())
+
+
+def _worker_stats_path(pid):
+    return os.path.join(WORKER_STATS_DIR, f"worker-{pid}.json")
+
+
+def _publish_worker_stats():
+    path = _worker_stats_path(os.getpid())
+    snapshot = {
+        "pid": os.getpid(),
+        "written_at": time.time(),
+        "drift": drift_monitor.state() if drift_monitor is not None else None,
+        "explain": severity_explainer.stats() if severity_explainer is not None else None,
+    }
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(snapshot, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def _peer_worker_stats():
+    """Latest snapshots from the other serve.py workers (empty when running single-process)."""
+    if not WORKER_STATS_DIR:
+        return []
+    own = os.path.basename(_worker_stats_path(os.getpid()))
+    try:
+        names = os.listdir(WORKER_STATS_DIR)
+    except OSError:
+        return []
+    peers = []
+    for name in names:
+        if name == own or not (name.startswith("worker-") and name.endswith(".json")):
+            continue
+        try:
+            with open(os.path.join(WORKER_STATS_DIR, name)) as f:
+                peers.append(json.load(f))
+        except (OSError, ValueError):
+            continue  # worker just exited and the supervisor removed its file
+    return peers
+
+
+@app.on_event("startup")
+async def _start_worker_stats_publisher():
+    if not WORKER_STATS_DIR:
+        return
+
+    async def _publish_periodically():
+        while True:
+            try:
+                _publish_worker_stats()
+            except Exception as e:
+                print(f"⚠️ WARNING: Could not publish worker stats: {e}")
+            await asyncio.sleep(WORKER_STATS_INTERVAL_S)
+
+    app.state.worker_stats_task = asyncio.create_task(_publish_periodically())
+
+
 # 6. Severity Prediction Route
 @app.post("/severity")
-async def predict_severity(data: SeverityData):
+async def predict_severity(data: SeverityData, explain: bool = False, top_k: int = 5):
     print(f"🔍 DEBUG: /severity endpoint called, model loaded: {severity_model is not None}")
+    _require_ready()
     if severity_model is None or not severity_feature_names:
         raise HTTPException(status_code=500, detail="Severity model artifacts not loaded.")
 
@@ -333,6 +615,8 @@ async def predict_severity(data: SeverityData):
         data_dict = data.model_dump()
         print(f"🔍 DEBUG: Received data: {data_dict}")
 
+        import pandas as pd
+
         # Build baseline in normalized feature space.
         # If the model was trained on z-scored features, using zeros is a neutral baseline.
         input_df = pd.DataFrame(np.zeros((1, len(severity_feature_names))), columns=severity_feature_names)
@@ -489,8 +773,17 @@ async def predict_severity(data: SeverityData):
             }
         }
         
-        print(f"🔍 DEBUG: Returning result: {result}")
-        return result
+        if explain:
+            if severity_explainer is None:
+                result["explanation"] = {"status": "unavailable", "top_features": []}
+            else:
+                result["explanation"] = await severity_explainer.explain(
+                    input_df[severity_feature_names].to_numpy(dtype=np.float32)[0],
+                    raw_prediction,
+                    top_k=top_k,
+                    values=data_dict,
+                )
+                result["explanation"]["class"] = severity_labels[min(raw_prediction, len(severity_labels) - 1)]
 
     except Exception as e:
         print(f"❌ ERROR: Prediction failed: {e}")
@@ -498,6 +791,17 @@ async def predict_severity(data: SeverityData):
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+    # Only fields the client actually sent; schema defaults would mask real drift.
+    # Synthetic warm-up requests are not live traffic. Monitoring must never fail a scored request.
+    if drift_monitor is not None and not _warmup_request.get():
+        try:
+            drift_monitor.observe(data.model_dump(exclude_unset=True))
+        except Exception as e:
+            print(f"⚠️ WARNING: Drift observation skipped: {e}")
+
+    print(f"🔍 DEBUG: Returning result: {result}")
+    return result
+
 
 @app.get("/severity")
 async def severity_get():
@@ -525,6 +829,9 @@ async def root():
             "/sepsis-warning": "POST - Early diagnosis (risk score)",
             "/severity": "POST - Sepsis severity classification",
             "/predict-severity": "POST - Severity (alias of /severity)",
+            "/drift": "GET - Input drift vs. training statistics",
+            "/ready": "GET - Readiness (models loaded and warmed up)",
+            "/explain-stats": "GET - Feature attribution latency/cache statistics",
             "/docs": "GET - API documentation",
             "/test": "GET - Test endpoint"
         },
@@ -539,9 +846,38 @@ async def root():
 async def test():
     return {"status": "Backend is running", "timestamp": "working"}
 
+
+@app.get("/ready")
+async def ready():
+    return JSONResponse(status_code=200 if startup_report["ready"] else 503, content=startup_report)
+
+
+# Under serve.py both views cover every worker: this worker live, the others as of their last
+# snapshot (at most SEPSIS_WORKER_STATS_INTERVAL_S old).
+@app.get("/explain-stats")
+async def explain_stats():
+    if severity_explainer is None:
+        raise HTTPException(status_code=503, detail="Severity explainer not available.")
+    peers = [p["explain"] for p in _peer_worker_stats() if p.get("explain")]
+    return merge_stats([severity_explainer.stats(), *peers])
+
+
+@app.get("/drift")
+async def drift():
+    if drift_monitor is None:
+        raise HTTPException(status_code=503, detail="Drift monitor not available (no reference statistics loaded).")
+    peers = [p["drift"] for p in _peer_worker_stats() if p.get("drift")]
+    monitor = drift_monitor
+    if peers:
+        monitor = DriftMonitor(_drift_reference(), aliases=UI_MAP).merge(drift_monitor)
+        for state in peers:
+            monitor.merge(state)
+    return {"interval_s": DRIFT_INTERVAL_S, "workers": 1 + len(peers), **monitor.report()}
+
 # 9. Sepsis Early Warning Route
 @app.post("/sepsis-warning")
 async def sepsis_early_warning(data: SepsisEarlyWarningData):
+    _require_ready()
     # Allow fallback calculation even if models aren't loaded
     use_fallback = sepsis_decision_engine is None or base_vitals_model is None
 
@@ -564,64 +900,25 @@ async def sepsis_early_warning(data: SepsisEarlyWarningData):
     try:
         # Step 1: Transform raw vitals through base_vitals_model to get Prob
         # Build a vitals feature vector that matches the trained base_vitals_model
-        base_feature_names = getattr(base_vitals_model, 'feature_names_in_', None) if base_vitals_model is not None else None
         base_expected = getattr(base_vitals_model, 'n_features_in_', None) if base_vitals_model is not None else None
 
-        # Derive MAP if possible
-        default_dbp = float(_EARLY_VITALS_DEFAULTS["DBP"])
-        map_calc = (float(data.SBP) + 2.0 * default_dbp) / 3.0
-
-        shock_index = (float(data.HR) / float(data.SBP)) if float(data.SBP) else 0.0
-
-        vitals_candidates = {
-            # UI keys
-            "HR": float(data.HR),
-            "Temp": float(data.Temp),
-            "SBP": float(data.SBP),
-            "DBP": default_dbp,
-            "MAP": map_calc,
-            "O2Sat": float(_EARLY_VITALS_DEFAULTS["O2Sat"]),
-            "Resp": float(_EARLY_VITALS_DEFAULTS["Resp"]),
-            "Shock_Index": shock_index,
-            "shock_index": shock_index,
-            "MAP_Calc": map_calc,
-            # common training column names
-            "heart_rate": float(data.HR),
-            "temperature": float(data.Temp),
-            "systolic_bp": float(data.SBP),
-            "diastolic_bp": default_dbp,
-            "mean_bp": map_calc,
-            "oxygen_saturation": float(_EARLY_VITALS_DEFAULTS["O2Sat"]),
-            "respiratory_rate": float(_EARLY_VITALS_DEFAULTS["Resp"]),
-            "map": map_calc,
-            "sbp": float(data.SBP),
-            "hr": float(data.HR),
-        }
-
-        if base_feature_names is not None and len(base_feature_names) > 0:
-            vitals_input = np.array([[float(vitals_candidates.get(str(name), 0.0)) for name in base_feature_names]])
-        elif base_expected is not None and int(base_expected) == 7:
-            vitals_input = np.array([[
-                float(vitals_candidates["HR"]),
-                float(vitals_candidates["Temp"]),
-                float(vitals_candidates["SBP"]),
-                float(vitals_candidates["DBP"]),
-                float(vitals_candidates["MAP"]),
-                float(vitals_candidates["O2Sat"]),
-                float(vitals_candidates["Resp"]),
-            ]])
-        else:
-            vitals_input = np.array([[float(data.HR), float(data.Temp), float(data.SBP)]])
+        n_vitals_features = len(_early_vitals_columns())
         can_use_base = (
             not use_fallback and
             base_vitals_model is not None and
-            (base_expected is None or int(base_expected) == int(vitals_input.shape[1]))
+            (base_expected is None or int(base_expected) == n_vitals_features)
         )
+        vitals_source = "fallback"
         if can_use_base:
             try:
-                if hasattr(base_vitals_model, 'predict_proba'):
-                    probs = base_vitals_model.predict_proba(vitals_input)[0]
-                    vitals_prob = probs[1] if len(probs) > 1 else probs[0]
+                lut_prob = vitals_lut.lookup(data.HR, data.Temp, data.SBP) if vitals_lut is not None else None
+                if lut_prob is not None:
+                    vitals_prob = lut_prob
+                    vitals_source = "lookup_table"
+                elif hasattr(base_vitals_model, 'predict_proba'):
+                    # Only the model path needs the full input vector
+                    vitals_prob = float(_base_vitals_probs_for([data.HR], [data.Temp], [data.SBP])[0])
+                    vitals_source = "model"
                 else:
                     # Fallback: use a simple heuristic based on vitals
                     hr_risk = abs(data.HR - 80) / 100.0
@@ -636,8 +933,8 @@ async def sepsis_early_warning(data: SepsisEarlyWarningData):
                 sbp_risk = max(0, (120 - data.SBP) / 120.0) if data.SBP < 120 else 0
                 vitals_prob = min(1.0, (hr_risk + temp_risk + sbp_risk) / 3.0)
         else:
-            if base_expected is not None and int(base_expected) != int(vitals_input.shape[1]):
-                print(f"⚠️ WARNING: base_vitals_model expects {int(base_expected)} features but got {int(vitals_input.shape[1])}; using fallback")
+            if base_expected is not None and int(base_expected) != n_vitals_features:
+                print(f"⚠️ WARNING: base_vitals_model expects {int(base_expected)} features but got {n_vitals_features}; using fallback")
             # Fallback calculation when models not usable
             hr_risk = abs(data.HR - 80) / 100.0
             temp_risk = abs(data.Temp - 37.0) / 3.0
@@ -729,6 +1026,7 @@ async def sepsis_early_warning(data: SepsisEarlyWarningData):
             },
             "model_status": {
                 "using_fallback": use_fallback,
+                "vitals_source": vitals_source,
                 "models_loaded": {
                     "sepsis_decision_engine": sepsis_decision_engine is not None,
                     "base_vitals_model": base_vitals_model is not None
@@ -761,8 +1059,8 @@ async def predict_early_get():
 
 # Backward-compatible naming for severity
 @app.post("/predict-severity")
-async def predict_severity_alias(data: SeverityData):
-    return await predict_severity(data)
+async def predict_severity_alias(data: SeverityData, explain: bool = False, top_k: int = 5):
+    return await predict_severity(data, explain=explain, top_k=top_k)
 
 
 @app.get("/predict-severity")
@@ -779,6 +1077,185 @@ async def sepsis_warning_post_alias(data: SepsisEarlyWarningData):
 async def sepsis_warning_get_alias():
     raise HTTPException(status_code=405, detail="Method Not Allowed. Use POST /sepsis-warning with JSON body.")
 
+# 10. Startup: load artifacts, warm up every scoring path, then report ready
+_artifacts_lock = threading.Lock()
+_artifacts_loaded = False
+WARMUP_ROUNDS = int(os.environ.get("SEPSIS_WARMUP_ROUNDS", "3"))
+startup_report = {
+    "ready": False,
+    "artifacts_load_s": None,
+    "warmup_s": None,
+    "time_to_ready_s": None,
+    "warmup_latency_ms": {},
+    "first_request_ms": {},
+    "error": None,
+}
+
+
+# Set while warm_up() drives the scoring handlers, which run before the API reports ready
+_warmup_request = contextvars.ContextVar("warmup_request", default=False)
+
+
+def _reset_process_start():
+    global _PROCESS_START
+    _PROCESS_START = time.perf_counter()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_process_start)
+
+
+def _require_ready():
+    if not startup_report["ready"] and not _warmup_request.get():
+        raise HTTPException(status_code=503, detail="Models are still loading or warming up; check GET /ready.")
+
+
+def load_artifacts():
+    """Load models, the vitals lookup table and the drift monitor once.
+
+    Called in the background at startup, or up front by serve.py so forked
+    workers share the loaded models.
+    """
+    global _artifacts_loaded
+    with _artifacts_lock:
+        if _artifacts_loaded:
+            return
+        start = time.perf_counter()
+        _load_model_artifacts()
+        _build_vitals_lut()
+        _build_drift_monitor()
+        _build_severity_explainer()
+        startup_report["artifacts_load_s"] = round(time.perf_counter() - start, 3)
+        _artifacts_loaded = True
+
+
+def reload_artifacts():
+    """Forget every loaded artifact and load them again from disk (serve.py does this on SIGHUP)."""
+    global _artifacts_loaded, severity_model, severity_feature_names, severity_scaler, healthy_medians
+    global clinical_bridge, sepsis_decision_engine, base_vitals_model, base_vitals_model_tag, vitals_lut
+    global artifact_bundle, drift_monitor, severity_explainer
+    with _artifacts_lock:
+        severity_model = severity_feature_names = severity_scaler = healthy_medians = clinical_bridge = None
+        sepsis_decision_engine = base_vitals_model = vitals_lut = artifact_bundle = None
+        drift_monitor = severity_explainer = None
+        base_vitals_model_tag = ""
+        _artifacts_loaded = False
+    load_artifacts()
+
+
+def _warmup_payloads():
+    return {
+        "/severity": (predict_severity, [
+            SeverityData(),
+            SeverityData(HR=138, O2Sat=86, Temp=39.4, SBP=78, DBP=42, MAP=54, Resp=30,
+                         WBC=22.0, Platelets=80, Lactate=5.1, Creatinine=2.6, SOFA_score=11),
+        ]),
+        "/sepsis-warning": (sepsis_early_warning, [
+            SepsisEarlyWarningData(),
+            SepsisEarlyWarningData(HR=134, Temp=39.5, SBP=82, Lactate=4.8, Baseline_Lactate=2.2, Creatinine=2.4),
+        ]),
+    }
+
+
+def warm_up():
+    """Run synthetic requests through each scoring path so lazy init happens before readiness."""
+    start = time.perf_counter()
+    loop = asyncio.new_event_loop()
+    # Tasks on this loop copy this thread's context, so only the warm-up calls see the flag
+    token = _warmup_request.set(True)
+    print("🔥 Warm-up: synthetic requests follow")
+    try:
+        for path, (handler, payloads) in _warmup_payloads().items():
+            timings = []
+            error = None
+            for _ in range(max(1, WARMUP_ROUNDS)):
+                for payload in payloads:
+                    t0 = time.perf_counter()
+                    try:
+                        loop.run_until_complete(handler(payload))
+                    except Exception as e:
+                        error = str(getattr(e, "detail", e))
+                    timings.append((time.perf_counter() - t0) * 1000)
+            startup_report["warmup_latency_ms"][path] = {
+                "cold": round(timings[0], 2),
+                "warm": round(sorted(timings[1:])[len(timings[1:]) // 2], 2) if len(timings) > 1 else None,
+                "error": error,
+            }
+    finally:
+        _warmup_request.reset(token)
+        loop.close()
+    if severity_explainer is not None:
+        t0 = time.perf_counter()
+        severity_explainer.warm_up()
+        startup_report["warmup_latency_ms"]["explain"] = {
+            "cold": round((time.perf_counter() - t0) * 1000, 2), "warm": None, "error": None,
+        }
+    startup_report["warmup_s"] = round(time.perf_counter() - start, 3)
+
+
+def _warm_up_and_mark_ready():
+    try:
+        load_artifacts()
+        warm_up()
+        # Readiness means scoring works: any failing warm-up call keeps /ready red
+        failed = [f"{path}: {stats['error']}" for path, stats in startup_report["warmup_latency_ms"].items() if stats["error"]]
+        if failed:
+            raise RuntimeError(f"warm-up failed ({'; '.join(failed)})")
+    except Exception as e:
+        startup_report["error"] = str(e)
+        print(f"❌ ERROR: Startup failed, /ready stays red: {e}")
+        import traceback
+        traceback.print_exc()
+        return
+    startup_report["time_to_ready_s"] = round(time.perf_counter() - _PROCESS_START, 3)
+    startup_report["ready"] = True
+    print(
+        f"✅ READY in {startup_report['time_to_ready_s']}s "
+        f"(artifacts {startup_report['artifacts_load_s']}s, warm-up {startup_report['warmup_s']}s)"
+    )
+    for path, stats in startup_report["warmup_latency_ms"].items():
+        print(f"  {path}: first call {stats['cold']} ms, steady state {stats['warm']} ms"
+              + (f" (error: {stats['error']})" if stats["error"] else ""))
+
+
+@app.on_event("startup")
+async def _warm_start():
+    if _artifacts_loaded:
+        # Preloaded (serve.py): finish warming this worker before uvicorn reports it started
+        await asyncio.to_thread(_warm_up_and_mark_ready)
+    else:
+        # Liveness routes answer immediately; /ready turns green once this finishes
+        app.state.warmup_task = asyncio.create_task(asyncio.to_thread(_warm_up_and_mark_ready))
+
+
+class _FirstRequestTimer:
+    """ASGI middleware recording the latency of the first real request to each scoring route."""
+
+    _PATHS = {"/severity", "/predict-severity", "/sepsis-warning", "/predict"}
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path")
+        if (
+            scope["type"] != "http"
+            or path not in self._PATHS
+            or path in startup_report["first_request_ms"]
+            or not startup_report["ready"]
+        ):
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            latency = round((time.perf_counter() - start) * 1000, 2)
+            startup_report["first_request_ms"][path] = latency
+            print(f"⏱️ First {path} request after ready: {latency} ms")
+
+
+app.add_middleware(_FirstRequestTimer)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,52 @@
+"""Drift monitor checks; run from the backend folder with ``python -m pytest``.
+
+Needs requirements-dev.txt (pytest, and httpx for fastapi.testclient).
+"""
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from drift_monitor import DriftMonitor
+
+HEALTHY = {"HR": 72, "O2Sat": 98, "Temp": 36.8, "SBP": 122, "DBP": 78, "MAP": 93, "Resp": 14,
+           "WBC": 7.5, "Platelets": 260, "Lactate": 0.9, "Creatinine": 0.9, "Glucose": 95, "Age": 45}
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(main.app) as c:
+        deadline = time.monotonic() + 60
+        while c.get("/ready").status_code != 200:
+            assert time.monotonic() < deadline, "API did not become ready"
+            time.sleep(0.1)
+        yield c
+
+
+def test_observe_ignores_non_numeric_values():
+    monitor = DriftMonitor({"heart_rate": (85.0, 20.0)}, aliases={"HR": "heart_rate"})
+    monitor.observe({"HR": "90 bpm", "heart_rate": None})
+    monitor.observe({"HR": float("nan")})
+    monitor.observe({"HR": True})
+    assert monitor.report()["current_window"]["observations"] == 0
+    monitor.observe({"HR": 90})
+    assert monitor.report()["current_window"]["observations"] == 1
+
+
+def test_healthy_payload_is_not_out_of_range(client):
+    before = client.get("/drift").json()["current_window"]["observations"]
+    assert client.post("/severity", json=HEALTHY).status_code == 200
+
+    report = client.get("/drift").json()
+    window = report["current_window"]
+    assert window["observations"] > before
+    assert window["out_of_range_fraction"] == pytest.approx(0.0, abs=1e-9)
+    for name, stats in window["features"].items():
+        assert abs(stats["mean_shift_std"]) < 2.0, name
+        assert name in report["tracked_features"]
+
+
+def test_non_numeric_extra_field_does_not_fail_scoring(client):
+    response = client.post("/severity", json={"HR": 90, "bilirubin": "1.2 mg/dL", "heart_rate": "high"})
+    assert response.status_code == 200
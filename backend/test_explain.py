@@ -0,0 +1,86 @@
+"""Feature attribution checks; run from the backend folder with ``python -m pytest``."""
+import asyncio
+import time
+
+import numpy as np
+import pytest
+import xgboost as xgb
+from fastapi.testclient import TestClient
+
+import main
+from explain import SeverityExplainer
+
+
+@pytest.fixture(scope="module")
+def model():
+    main.load_artifacts()
+    if main.severity_model is None or not hasattr(main.severity_model, "get_booster"):
+        pytest.skip("XGBoost severity model not available")
+    return main.severity_model
+
+
+@pytest.fixture(scope="module")
+def rows(model):
+    rng = np.random.default_rng(0)
+    return rng.normal(0.0, 3.0, size=(32, len(main.severity_feature_names))).astype(np.float32)
+
+
+@pytest.mark.parametrize("method", ["approx", "exact"])
+def test_contributions_sum_to_margin(model, rows, method):
+    explainer = SeverityExplainer(model, main.severity_feature_names, method=method)
+    contribs = explainer.contributions(rows)
+    dmat = xgb.DMatrix(rows, feature_names=main.severity_feature_names)
+    margin = model.get_booster().predict(dmat, output_margin=True).reshape(len(rows), -1)
+    np.testing.assert_allclose(contribs.sum(axis=-1), margin, atol=1e-3)
+
+
+def test_repeated_vector_is_cached_and_duplicates_share_one_row(model, rows):
+    explainer = SeverityExplainer(model, main.severity_feature_names, budget_ms=1000)
+
+    async def run():
+        first, twin = await asyncio.gather(explainer.explain(rows[0], 0), explainer.explain(rows[0], 0))
+        again = await explainer.explain(rows[0], 0, top_k=3)
+        return first, twin, again
+
+    first, twin, again = asyncio.run(run())
+    assert first["status"] == twin["status"] == "ok"
+    assert again["status"] == "cached"
+    assert len(again["top_features"]) == 3
+    assert explainer.stats()["batched_rows"] == 1
+
+
+def test_tiny_budget_times_out_and_sheds_load(model, rows):
+    explainer = SeverityExplainer(model, main.severity_feature_names, budget_ms=0.1, method="exact")
+    explainer.warm_up()
+
+    async def run():
+        results = await asyncio.gather(*(explainer.explain(row, 0) for row in rows))
+        await asyncio.sleep(0.2)  # let the drain task finish
+        return results
+
+    statuses = [r["status"] for r in asyncio.run(run())]
+    stats = explainer.stats()
+    assert "timeout" in statuses
+    assert "overloaded" in statuses
+    assert set(statuses) <= {"ok", "timeout", "overloaded"}
+    # Only admitted rows cost anything, and each one was either computed or dropped as expired
+    admitted = len(statuses) - statuses.count("overloaded")
+    assert admitted <= stats["queue_limit"] < len(rows)
+    assert stats["expired"] + stats["batched_rows"] == admitted
+    assert stats["expired"] > 0
+    assert stats["queued"] == 0
+
+
+def test_severity_route_returns_ui_named_drivers(model):
+    with TestClient(main.app) as client:
+        deadline = time.monotonic() + 60
+        while client.get("/ready").status_code != 200:
+            assert time.monotonic() < deadline, "API did not become ready"
+            time.sleep(0.1)
+        body = client.post("/severity?explain=true&top_k=3", json={"HR": 124, "SBP": 88, "Temp": 38.9}).json()
+
+    explanation = body["explanation"]
+    assert explanation["status"] in ("ok", "cached")
+    assert len(explanation["top_features"]) == 3
+    for driver in explanation["top_features"]:
+        assert driver["feature"] in main.UI_MAP
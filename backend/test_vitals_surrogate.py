@@ -0,0 +1,78 @@
+"""Vitals lookup-table checks; run from the backend folder with ``python -m pytest``."""
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+import main
+from vitals_surrogate import VitalsLookupTable
+
+SMALL_GRID = {"HR": (40.0, 160.0, 10.0), "Temp": (35.0, 40.0, 0.5), "SBP": (70.0, 180.0, 10.0)}
+
+
+@pytest.fixture(scope="module")
+def model():
+    # Smooth synthetic risk model on (HR, Temp, SBP)
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.uniform(40, 160, 2000), rng.uniform(35, 40, 2000), rng.uniform(70, 180, 2000)])
+    y = ((X[:, 0] - 90) / 30 + (X[:, 1] - 37) - (X[:, 2] - 120) / 30 + rng.normal(0, 1, 2000)) > 0
+    return LogisticRegression(max_iter=1000).fit(X, y)
+
+
+@pytest.fixture(scope="module")
+def table(model):
+    return VitalsLookupTable.build(lambda *cols: model.predict_proba(np.column_stack(cols))[:, 1], SMALL_GRID,
+                                   model_tag="tag-1", n_check=500)
+
+
+def test_lookup_matches_interpolate_and_model_at_nodes(model, table):
+    rng = np.random.default_rng(1)
+    pts = [rng.uniform(lo, hi, 50) for lo, hi, _ in SMALL_GRID.values()]
+    vectorised = table.interpolate(*pts)
+    for i in range(50):
+        assert table.lookup(pts[0][i], pts[1][i], pts[2][i]) == pytest.approx(vectorised[i], abs=1e-6)
+
+    for hr, temp, sbp in [(40.0, 35.0, 70.0), (90.0, 37.0, 120.0), (160.0, 40.0, 180.0)]:
+        expected = model.predict_proba([[hr, temp, sbp]])[0, 1]
+        assert table.lookup(hr, temp, sbp) == pytest.approx(expected, abs=1e-5)
+
+
+def test_out_of_grid_returns_none(table):
+    assert table.lookup(250.0, 37.0, 120.0) is None
+    assert table.lookup(90.0, 30.0, 120.0) is None
+    assert table.lookup(90.0, 37.0, 40.0) is None
+
+
+def test_save_load_round_trip(table, tmp_path):
+    path = tmp_path / "vitals_lut.npz"
+    table.save(path)
+    loaded = VitalsLookupTable.load(path)
+    np.testing.assert_array_equal(loaded.values, table.values)
+    assert loaded.max_error == table.max_error
+    assert loaded.p99_error == table.p99_error
+    assert loaded.model_tag == "tag-1"
+    assert loaded.lookup(95.0, 37.3, 118.0) == table.lookup(95.0, 37.3, 118.0)
+
+
+def test_tag_mismatch_rebuilds(model, table, tmp_path, monkeypatch):
+    path = tmp_path / "vitals_lut.npz"
+    table.save(path)
+    monkeypatch.setattr(main, "VITALS_LUT_ENABLED", True)
+    monkeypatch.setattr(main, "VITALS_LUT_PATH", str(path))
+    monkeypatch.setattr(main, "VITALS_LUT_GRID", "")
+    monkeypatch.setattr(main, "VITALS_LUT_MAX_ERROR", 1.0)
+    monkeypatch.setattr(main, "base_vitals_model", model)
+    monkeypatch.setattr(main, "base_vitals_model_tag", "model-sha")
+    monkeypatch.setattr(main, "vitals_lut", None)
+
+    main._build_vitals_lut()
+    assert main.vitals_lut is not None
+    assert main.vitals_lut.model_tag == main._vitals_lut_tag() != "tag-1"
+    assert main.vitals_lut.values.shape != table.values.shape  # rebuilt on the default grid
+
+    # Changing the fixed vitals changes the tag, so a table saved for the old defaults is rebuilt too
+    main.vitals_lut.save(path)
+    old_tag = main.vitals_lut.model_tag
+    monkeypatch.setitem(main._EARLY_VITALS_DEFAULTS, "DBP", 70.0)
+    assert main._vitals_lut_tag() != old_tag
+    main._build_vitals_lut()
+    assert main.vitals_lut.model_tag == main._vitals_lut_tag()
@@ -0,0 +1,174 @@
+"""Lookup-table surrogate for base_vitals_model in the early-warning path.
+
+In /sepsis-warning only HR, Temp and SBP vary (DBP, O2Sat and Resp come from
+_EARLY_VITALS_DEFAULTS and MAP / shock index are derived), so vitals_prob is
+a function of three bounded variables. This module precomputes it on a 3-D
+grid and serves requests by trilinear interpolation. Points outside the grid
+return None so the caller can fall back to the real model.
+
+Build at artifact time (run from the backend folder):
+    python vitals_surrogate.py [--out artifact_bundle/vitals_lut.npz] [--grid HR=30:220:2,SBP=50:250:2]
+"""
+import argparse
+import math
+import os
+import sys
+
+import numpy as np
+
+from artifacts import DEFAULT_BUNDLE_DIR
+
+# (low, high, step) per axis; clinically plausible adult ranges
+DEFAULT_GRID = {
+    "HR": (30.0, 220.0, 2.0),
+    "Temp": (32.0, 43.0, 0.1),
+    "SBP": (50.0, 250.0, 2.0),
+}
+AXES = ("HR", "Temp", "SBP")
+BUILD_CHUNK = 1 << 18
+DEFAULT_LUT_PATH = os.path.join(DEFAULT_BUNDLE_DIR, "vitals_lut.npz")
+
+
+def parse_grid(spec):
+    """Parse ``"HR=30:220:2,Temp=32:43:0.1"`` into ``{"HR": (30.0, 220.0, 2.0), ...}``."""
+    grid = {}
+    for part in filter(None, (p.strip() for p in (spec or "").split(","))):
+        name, _, bounds = part.partition("=")
+        if name not in AXES:
+            raise ValueError(f"Unknown vitals grid axis: {name!r} (expected one of {AXES})")
+        low, high, step = (float(v) for v in bounds.split(":"))
+        if not (high > low and step > 0):
+            raise ValueError(f"Invalid vitals grid range for {name}: {bounds}")
+        grid[name] = (low, high, step)
+    return grid
+
+
+def _axis(low, high, step):
+    n = int(round((high - low) / step)) + 1
+    return np.linspace(low, high, n)
+
+
+class VitalsLookupTable:
+    def __init__(self, axes, values, max_error=None, p99_error=None, model_tag=""):
+        self.axes = [np.asarray(a, dtype=np.float64) for a in axes]
+        self.values = np.ascontiguousarray(values, dtype=np.float32)
+        self.max_error = max_error
+        self.p99_error = p99_error
+        self.model_tag = model_tag
+        self._lo = [float(a[0]) for a in self.axes]
+        self._hi = [float(a[-1]) for a in self.axes]
+        self._step = [float(a[1] - a[0]) for a in self.axes]
+        self._n = [len(a) for a in self.axes]
+
+    @classmethod
+    def build(cls, predict_fn, grid=None, model_tag="", n_check=20000, seed=0):
+        """Evaluate ``predict_fn(hr, temp, sbp) -> probs`` on the grid in large batches.
+
+        The max / p99 absolute error is measured against ``predict_fn`` on
+        ``n_check`` random off-grid points.
+        """
+        grid = {**DEFAULT_GRID, **(grid or {})}
+        axes = [_axis(*grid[name]) for name in AXES]
+        hr, temp, sbp = (m.ravel() for m in np.meshgrid(*axes, indexing="ij"))
+        values = np.empty(hr.shape, dtype=np.float32)
+        for start in range(0, hr.size, BUILD_CHUNK):
+            end = start + BUILD_CHUNK
+            values[start:end] = predict_fn(hr[start:end], temp[start:end], sbp[start:end])
+        table = cls(axes, values.reshape([len(a) for a in axes]), model_tag=model_tag)
+
+        rng = np.random.default_rng(seed)
+        pts = [rng.uniform(a[0], a[-1], n_check) for a in axes]
+        exact = np.asarray(predict_fn(*pts), dtype=np.float64)
+        err = np.abs(table.interpolate(*pts) - exact)
+        table.max_error = float(err.max())
+        table.p99_error = float(np.quantile(err, 0.99))
+        return table
+
+    def interpolate(self, hr, temp, sbp):
+        """Vectorised trilinear interpolation; inputs are clipped to the grid."""
+        idx, frac = [], []
+        for k, x in enumerate((hr, temp, sbp)):
+            pos = np.clip((np.asarray(x, dtype=np.float64) - self._lo[k]) / self._step[k], 0.0, self._n[k] - 1)
+            i = np.minimum(pos.astype(np.intp), self._n[k] - 2)
+            idx.append(i)
+            frac.append(pos - i)
+        (i, j, k), (fx, fy, fz) = idx, frac
+        v = self.values
+        c00 = v[i, j, k] * (1 - fx) + v[i + 1, j, k] * fx
+        c01 = v[i, j, k + 1] * (1 - fx) + v[i + 1, j, k + 1] * fx
+        c10 = v[i, j + 1, k] * (1 - fx) + v[i + 1, j + 1, k] * fx
+        c11 = v[i, j + 1, k + 1] * (1 - fx) + v[i + 1, j + 1, k + 1] * fx
+        return (c00 * (1 - fy) + c10 * fy) * (1 - fz) + (c01 * (1 - fy) + c11 * fy) * fz
+
+    def lookup(self, hr, temp, sbp):
+        """Single-point O(1) lookup in plain Python. Returns None outside the grid."""
+        idx, frac = [], []
+        for k, x in enumerate((float(hr), float(temp), float(sbp))):
+            if not (self._lo[k] <= x <= self._hi[k]):
+                return None
+            pos = (x - self._lo[k]) / self._step[k]
+            i = min(int(math.floor(pos)), self._n[k] - 2)
+            idx.append(i)
+            frac.append(pos - i)
+        (i, j, k), (fx, fy, fz) = idx, frac
+        v = self.values.item
+        c00 = v(i, j, k) * (1 - fx) + v(i + 1, j, k) * fx
+        c01 = v(i, j, k + 1) * (1 - fx) + v(i + 1, j, k + 1) * fx
+        c10 = v(i, j + 1, k) * (1 - fx) + v(i + 1, j + 1, k) * fx
+        c11 = v(i, j + 1, k + 1) * (1 - fx) + v(i + 1, j + 1, k + 1) * fx
+        return (c00 * (1 - fy) + c10 * fy) * (1 - fz) + (c01 * (1 - fy) + c11 * fy) * fz
+
+    def save(self, path):
+        np.savez(
+            path,
+            hr=self.axes[0],
+            temp=self.axes[1],
+            sbp=self.axes[2],
+            values=self.values,
+            max_error=np.float64(np.nan if self.max_error is None else self.max_error),
+            p99_error=np.float64(np.nan if self.p99_error is None else self.p99_error),
+            model_tag=np.array(self.model_tag),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as npz:
+            max_error = float(npz["max_error"])
+            p99_error = float(npz["p99_error"])
+            return cls(
+                [npz["hr"], npz["temp"], npz["sbp"]],
+                npz["values"],
+                max_error=None if np.isnan(max_error) else max_error,
+                p99_error=None if np.isnan(p99_error) else p99_error,
+                model_tag=str(npz["model_tag"]),
+            )
+
+    def summary(self):
+        return {
+            "grid": {name: [self._lo[k], self._hi[k], round(self._step[k], 6)] for k, name in enumerate(AXES)},
+            "points": int(self.values.size),
+            "max_abs_error": self.max_error,
+            "p99_abs_error": self.p99_error,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute the base_vitals_model lookup table.")
+    parser.add_argument("--out", default=DEFAULT_LUT_PATH)
+    parser.add_argument("--grid", default="", help="Override axes, e.g. HR=30:220:2,Temp=32:43:0.1")
+    args = parser.parse_args(argv)
+
+    import main as api
+
+    api.load_artifacts()
+    if api.base_vitals_model is None:
+        print("❌ CRITICAL: base_vitals_model not loaded; nothing to tabulate.")
+        return 1
+    table = VitalsLookupTable.build(api._base_vitals_probs_for, parse_grid(args.grid), model_tag=api._vitals_lut_tag())
+    table.save(args.out)
+    print(f"✅ SUCCESS: Wrote vitals lookup table to {args.out}: {table.summary()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())